@@ -5,6 +5,11 @@ This module contains functions to interface with the Game Info
 and Rental databases.
 This includes functions to retrieve all entries or a specific entry
 in a database, and a function to add entries to a database.
+Every change to a database is published to the event bus so that
+other modules can update their data without re-reading it, and
+lookups of single entries are cached until a database changes.
+Each database is only read from disk the first time it is needed and
+is shared by every module until it changes.
 
 Functions:
 - GetDatabase(database): Accepts a database name and returns all entries
@@ -21,16 +26,57 @@ for a database entry, then adds that entry to Rental.
 
 - CompleteRental(gameID, returnDate): Adds a return date to the latest rental of
 a copy of a game.
+
+- AddGameEntries(entries): Adds a list of new game entries to Game Info
+in a single write.
+
+- GetVersion(database): Returns the version of a database on disk, which
+changes every time it is written to.
+
+- GetLatestRentals(): Returns the latest rental of each copy of a game
+and the number of times each copy has been rented.
 """
 
-# Last Updated: 11/12/2023
+# Last Updated: 19/10/2026
+
+import eventBus as eb
+import queryCache as qc
+import os
+
+# Database name -> ((modification time, size), entries) of databases
+# already read
+_loadedDatabases = {}
 
 # ----------------------------------------------------------------------
 # Functions
 # ----------------------------------------------------------------------
+def GetVersion(database):
+    """
+    Gets the version of a database on disk. Every change published to
+    the event bus includes the version of the database before and after
+    the change, so that modules can tell whether their data matched the
+    database before the change or it was also changed by something else.
+
+    Parameters:
+    string database: The file name of the database.
+
+    Returns:
+    list: The modification time and size of the database.
+    None: if the database doesn't exist.
+    """
+
+    try:
+        fileStat = os.stat(database)
+    except OSError:
+        return
+    return [fileStat.st_mtime_ns, fileStat.st_size]
+
+# ----------------------------------------------------------------------
+
 def GetDatabase(database):
     """
-    Returns all entries in the Game Info database.
+    Returns all entries in the Game Info database. The database is
+    only read the first time it is needed or if it has changed since.
 
     Parameters:
     string database: The file name of the database to access.
@@ -40,6 +86,32 @@ def GetDatabase(database):
     None: if an error occurs during operation.
     """
 
+    try:
+        fileStat = os.stat(database)
+    except OSError as e:
+        print(f"An error occurred: {e}")
+        return
+    fileVersion = (fileStat.st_mtime_ns, fileStat.st_size)
+
+    if database in _loadedDatabases:
+        loadedVersion, entries = _loadedDatabases[database]
+        if loadedVersion == fileVersion:
+            # Copy the entries so callers can't change the shared ones
+            return [list(entry) for entry in entries]
+
+    entries = _ReadDatabase(database)
+    if entries != None:
+        _loadedDatabases[database] = (fileVersion, entries)
+        return [list(entry) for entry in entries]
+
+# ----------------------------------------------------------------------
+
+def _ReadDatabase(database):
+    """
+    Reads all entries of a database from disk, as returned by
+    GetDatabase().
+    """
+
     gameInfoList = [] # Initialize the list to hold entries
     try:
         f = open(database, "r")
@@ -58,9 +130,41 @@ def GetDatabase(database):
 
 # ----------------------------------------------------------------------
 
+def GetLatestRentals():
+    """
+    Gets the latest rental of each copy of a game in the Rental
+    database, skipping blank or incomplete lines.
+
+    Parameters:
+    None
+
+    Returns:
+    tuple: A dictionary of game IDs as keys and the latest Rental entry
+    of each copy as values, and a dictionary of game IDs as keys and
+    the number of times each copy has been rented as values.
+    None: if an error occurs during operation.
+    """
+
+    rentalData = GetDatabase("Rental.txt")
+    if rentalData == None:
+        return
+
+    # Rentals are stored in date order, so the last one seen is the latest
+    latestRentals = {}
+    rentCounts = {}
+    for rental in rentalData:
+        if len(rental) < 4:
+            continue # Ignore blank or incomplete lines
+        latestRentals[rental[0]] = rental
+        rentCounts[rental[0]] = rentCounts.get(rental[0], 0) + 1
+    return latestRentals, rentCounts
+
+# ----------------------------------------------------------------------
+
 def GetEntry(gameID):
     """
-    Gets the info of a specific entry from a database.
+    Gets the info of a specific entry from a database. Results are
+    cached until a database changes.
 
     Parameters:
     string gameID: The id of the copy of the game to get info from.
@@ -72,6 +176,16 @@ def GetEntry(gameID):
     None: if an error occurs during operation.
     """
 
+    return qc.CachedCall(_ReadEntry, gameID)
+
+# ----------------------------------------------------------------------
+
+def _ReadEntry(gameID):
+    """
+    Reads the info of a specific entry from the databases, as
+    returned by GetEntry().
+    """
+
     databases = ["Game_Info.txt", "Rental.txt"]
     returnList = []
 
@@ -113,6 +227,7 @@ def RemoveEntry(database, gameID):
     # List of database names
     try:
         fileStr = ""
+        oldVersion = GetVersion(database)
 
         # Iterate over entries in the database
         f = open(database, "r")
@@ -130,6 +245,11 @@ def RemoveEntry(database, gameID):
         f.write(fileStr)
         f.close()
 
+        _loadedDatabases.pop(database, None)
+        qc.BumpVersion()
+        eb.Publish(eb.PRUNED, GameID=gameID, Database=database,
+                   OldVersion=oldVersion, NewVersion=GetVersion(database))
+
     except Exception as e:
         f.close()
         print(f"An error occurred: {e}")
@@ -153,9 +273,17 @@ def AddRentalEntry(gameID, rentDate, renterID):
         # Build new entry to write
         entryString = f"{gameID},{rentDate},,{renterID}\n"
 
+        oldVersion = GetVersion("Rental.txt")
         f = open("Rental.txt", "a") # Write to Rental
         f.write(entryString)
         f.close()
+
+        _loadedDatabases.pop("Rental.txt", None)
+        qc.BumpVersion()
+        eb.Publish(eb.RENTED, GameID=gameID, Date=rentDate,
+                   RenterID=renterID, Database="Rental.txt",
+                   OldVersion=oldVersion,
+                   NewVersion=GetVersion("Rental.txt"))
     except Exception as e:
         f.close()
         print(f"An error occurred: {e}")
@@ -176,30 +304,89 @@ def CompleteRental(gameID, returnDate):
     """
 
     try:
+        oldVersion = GetVersion("Rental.txt")
         f = open("Rental.txt", "r")
 
         # Build a string containing the database
         fileStr = ""
+        returned = False
         for entry in f:
             entryLine = entry.strip()
             entryList = entryLine.split(",")
 
             # Add a return date to the corresponding entry
-            if entryList[0] == gameID and entryList[2] == "":
+            if (len(entryList) >= 4 and entryList[0] == gameID
+                    and entryList[2] == ""):
                 returnedEntry = entry.replace(",,",f",{returnDate},")
                 fileStr = fileStr + returnedEntry
+                returned = True
             else:
                 fileStr = fileStr + entry
         f.close()
 
+        if not returned:
+            return # The copy isn't being rented, so nothing has changed
+
         # Write to the database with the added return date
         f = open("Rental.txt", "w")
         f.write(fileStr)
         f.close()
+
+        _loadedDatabases.pop("Rental.txt", None)
+        qc.BumpVersion()
+        eb.Publish(eb.RETURNED, GameID=gameID, Date=returnDate,
+                   Database="Rental.txt", OldVersion=oldVersion,
+                   NewVersion=GetVersion("Rental.txt"))
     except Exception as e:
         f.close()
         print(f"An error occurred: {e}")
 
+# ----------------------------------------------------------------------
+
+def AddGameEntries(entries):
+    """
+    Adds new entries to Game Info. The database is rewritten to a
+    temporary file which then replaces it, so either every entry is
+    added or none are.
+
+    Parameters:
+    list entries: A list of entries, each a list of the GameID,
+    Platform, Genre, Title, Publisher and PurchaseDate of a copy.
+
+    Returns:
+    bool: True if the entries were added, otherwise False.
+    """
+
+    tempName = "Game_Info.txt.tmp"
+    try:
+        oldVersion = GetVersion("Game_Info.txt")
+        f = open("Game_Info.txt", "r", newline="")
+        fileStr = f.read()
+        f.close()
+
+        # Match the line endings already used in the database
+        newline = "\r\n" if "\r\n" in fileStr else "\n"
+        if fileStr != "" and not fileStr.endswith("\n"):
+            fileStr = fileStr + newline
+        newLines = [",".join(entry) + newline for entry in entries]
+
+        f = open(tempName, "w", newline="")
+        f.write(fileStr + "".join(newLines))
+        f.close()
+        os.replace(tempName, "Game_Info.txt")
+    except Exception as e:
+        f.close()
+        print(f"An error occurred: {e}")
+        if os.path.exists(tempName):
+            os.remove(tempName)
+        return False
+
+    _loadedDatabases.pop("Game_Info.txt", None)
+    qc.BumpVersion()
+    eb.Publish(eb.STOCKED, Entries=entries, Database="Game_Info.txt",
+               OldVersion=oldVersion, NewVersion=GetVersion("Game_Info.txt"))
+    return True
+
 # ----------------------------------------------------------------------
 # MAIN CODE
 # ----------------------------------------------------------------------
@@ -240,4 +427,11 @@ if __name__ == "__main__":
     print(GetEntry("cod09"))
 
     # Remove new entry from rental
-    RemoveEntry("Rental.txt", "cod09")
\ No newline at end of file
+    RemoveEntry("Rental.txt", "cod09")
+
+    print("-"*100)
+
+    # Repeat lookups are served from the cache
+    for i in range(0,3):
+        GetEntry("cod01")
+    print(qc.GetCacheStats())
\ No newline at end of file
@@ -0,0 +1,455 @@
+"""
+Event Bus module - eventBus.py
+
+This module lets other modules know when the databases change, so
+that they can update their in-memory data instead of re-reading the
+databases. Every change is published as an event to the functions
+subscribed to its type and appended to the Event Log, which other
+processes can follow to pick up changes made outside their own process.
+
+Event types:
+- RENTED: A copy has been rented. Has GameID, Date and RenterID.
+- RETURNED: A copy has been returned. Has GameID and Date.
+- PRUNED: A copy's entries have been removed from a database.
+Has GameID.
+- REVIEWED: Feedback has been added for a copy. Has GameID, Rating
+and Comment.
+- STOCKED: New copies have been added to Game Info. Has Entries, a list
+of the new Game Info entries.
+
+Every event also has Database, the file name of the database changed,
+and OldVersion and NewVersion, the versions of that database before and
+after the change as returned by database.GetVersion(). A module should
+only apply an event to its data if its data matched OldVersion, and
+otherwise rebuild its data from the database.
+
+The Event Log is only appended to, so it should be trimmed regularly
+with TrimLog(), which the nightly report job in storeReport.py does.
+Positions in the log don't change when it is trimmed. Don't delete the
+log while other processes are running, as they will then skip events
+until the new log grows past the position they had reached.
+
+Functions:
+- Subscribe(eventType, handler): Calls the given function with every
+event of the given type that is published.
+- Publish(eventType, **data): Sends an event to all of its subscribers
+and appends it to the Event Log.
+- ReadEvents(offset): Reads all events in the Event Log after the given
+position in the log.
+- TailEvents(): Sends events logged by other processes since the last
+call to the subscribers in this process.
+- GetLogOffset(): Returns the position of the end of the Event Log.
+- TrimLog(offset): Removes the events logged before the given position
+from the Event Log.
+- LoggedBefore(event, offset): Returns whether an event read from the
+Event Log was logged before the given position.
+- NewStore(databases): Creates the state of an in-memory store built
+from some databases and kept up to date from events.
+- NeedsBuild(store): Returns whether a store must be built from its
+databases.
+- FinishBuild(store): Records that a store has been built.
+- ApplyEvent(store, event, apply): Applies an event to a store if the
+store matched the database before the change.
+"""
+
+# Last Updated: 19/10/2026
+
+import database as db
+import json
+import os
+import time
+
+# ----------------------------------------------------------------------
+# Event data
+# ----------------------------------------------------------------------
+
+RENTED = "Rented"
+RETURNED = "Returned"
+PRUNED = "Pruned"
+REVIEWED = "Reviewed"
+STOCKED = "Stocked"
+
+EVENT_LOG = "Event_Log.txt"
+TRIMMED = "Trimmed" # Type of the first line of a trimmed log
+logEvents = True # Set to False to stop appending events to the log
+
+_subscribers = {RENTED: [], RETURNED: [], PRUNED: [], REVIEWED: [],
+                STOCKED: []}
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def _LogStart(f):
+    """
+    Returns the position in the log of the first event in the open Event
+    Log file, and the length of the line before it recording where the
+    log was trimmed, or (0, 0) if the log hasn't been trimmed.
+    """
+
+    first = f.readline()
+    f.seek(0)
+    if first.endswith(b"\n"):
+        try:
+            header = json.loads(first)
+            if header.get("Type") == TRIMMED:
+                return int(header["Base"]), len(first)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            pass
+    return 0, 0
+
+# ----------------------------------------------------------------------
+
+def Subscribe(eventType, handler):
+    """
+    Subscribes a function to an event type.
+
+    Parameters:
+    string eventType: One of RENTED, RETURNED, PRUNED, REVIEWED
+    or STOCKED.
+    function handler: A function accepting an event dictionary.
+
+    Returns:
+    None
+    """
+
+    if handler not in _subscribers[eventType]:
+        _subscribers[eventType].append(handler)
+
+# ----------------------------------------------------------------------
+
+def _Dispatch(event):
+    """
+    Sends an event to every function subscribed to its type.
+    """
+
+    for handler in _subscribers.get(event["Type"], []):
+        try:
+            handler(event)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+# ----------------------------------------------------------------------
+
+def Publish(eventType, **data):
+    """
+    Publishes an event to its subscribers and appends it to the
+    Event Log.
+
+    Parameters:
+    string eventType: One of RENTED, RETURNED, PRUNED, REVIEWED
+    or STOCKED.
+    data: The details of the event, e.g. GameID="cod01".
+
+    Returns:
+    dict: The published event.
+    """
+
+    event = {"Type": eventType, "PID": os.getpid(), "Time": time.time()}
+    event.update(data)
+
+    if logEvents:
+        try:
+            f = open(EVENT_LOG, "a")
+            f.write(json.dumps(event) + "\n")
+            f.close()
+        except Exception as e:
+            f.close()
+            print(f"An error occurred: {e}")
+
+    _Dispatch(event)
+    return event
+
+# ----------------------------------------------------------------------
+
+def ReadEvents(offset):
+    """
+    Reads the events in the Event Log after the given position.
+
+    Parameters:
+    int offset: The position in the log to start reading from, as
+    returned by a previous call, or 0 to read the whole log. Events
+    before it that have been trimmed from the log are skipped.
+
+    Returns:
+    tuple: A list of events, each with an Offset giving its position
+    in the log, and the position in the log after them.
+    """
+
+    events = []
+    try:
+        f = open(EVENT_LOG, "rb")
+    except OSError:
+        return events, offset
+
+    base, headerSize = _LogStart(f)
+    if offset < base:
+        offset = base # Events before this have been trimmed from the log
+    f.seek(offset - base + headerSize)
+    for line in f:
+        if not line.endswith(b"\n"):
+            break # Ignore an event that is still being written
+        try:
+            event = json.loads(line)
+            event["Offset"] = offset
+            events.append(event)
+        except ValueError:
+            pass # Skip damaged lines
+        offset += len(line)
+    f.close()
+    return events, offset
+
+# ----------------------------------------------------------------------
+
+def GetLogOffset():
+    """
+    Gets the position of the end of the Event Log, which can be passed
+    to ReadEvents() later to read only the events logged after now.
+
+    Parameters:
+    None
+
+    Returns:
+    int: The position of the end of the Event Log, i.e. its size in
+    bytes plus the number of bytes trimmed from it, or 0 if it doesn't
+    exist.
+    """
+
+    try:
+        f = open(EVENT_LOG, "rb")
+    except OSError:
+        return 0
+    base, headerSize = _LogStart(f)
+    size = os.fstat(f.fileno()).st_size
+    f.close()
+    return base + size - headerSize
+
+# Position in the log up to which this process has seen events
+_logOffset = GetLogOffset()
+
+# ----------------------------------------------------------------------
+
+def LoggedBefore(event, offset):
+    """
+    Checks whether an event read from the Event Log was logged before
+    a position in the log. A module that rebuilds its data from the
+    databases records the end of the log first, and then uses this to
+    ignore events that its rebuilt data already includes.
+
+    Parameters:
+    dict event: An event, as passed to subscribers.
+    int offset: A position in the log, as returned by GetLogOffset().
+
+    Returns:
+    bool: True if the event is in the log before the position, or False
+    if it is after it or was published by this process.
+    """
+
+    if "Offset" not in event or offset == None:
+        return False
+    return event["Offset"] < offset
+
+# ----------------------------------------------------------------------
+
+def NewStore(databases):
+    """
+    Creates the state of a store, i.e. data built from some databases
+    that is kept up to date from events instead of being rebuilt.
+    A module builds its store when NeedsBuild() returns True, calls
+    FinishBuild() once it is built, and passes each event it is sent
+    to ApplyEvent().
+
+    Parameters:
+    list databases: The file names of the databases the store is
+    built from.
+
+    Returns:
+    dict: The state of the store, which hasn't been built yet.
+    """
+
+    return {"Databases" : list(databases),
+            "Loaded" : False,
+            "Versions" : None, # Versions of the databases the store matches
+            "Offset" : None, # Position in the Event Log when it was built
+            "Building" : None} # Versions and position of the current build
+
+# ----------------------------------------------------------------------
+
+def NeedsBuild(store):
+    """
+    Checks whether a store must be built from its databases, i.e. it
+    hasn't been built yet, missed a change, or its databases have been
+    changed without an event.
+
+    Parameters:
+    dict store: The state of the store, as returned by NewStore().
+
+    Returns:
+    bool: True if the store must be built, otherwise False.
+    """
+
+    versions = [db.GetVersion(database) for database in store["Databases"]]
+    if store["Loaded"] and versions == store["Versions"]:
+        return False
+
+    # Take the log position after the versions, so an event logged in
+    # between is either skipped because the build includes it, or
+    # causes another build because the versions no longer match
+    store["Loaded"] = False
+    store["Building"] = (versions, GetLogOffset())
+    return True
+
+# ----------------------------------------------------------------------
+
+def FinishBuild(store):
+    """
+    Records that a store has been built from the databases, after
+    NeedsBuild() returned True. If building fails, this isn't called
+    and the store is built again the next time it is used.
+
+    Parameters:
+    dict store: The state of the store, as returned by NewStore().
+
+    Returns:
+    None
+    """
+
+    store["Versions"], store["Offset"] = store["Building"]
+    store["Loaded"] = True
+
+# ----------------------------------------------------------------------
+
+def ApplyEvent(store, event, apply):
+    """
+    Applies an event to a store by calling apply(event), unless the
+    store hasn't been built, the event isn't for one of its databases
+    or the store already includes it. If the store didn't match the
+    database before the change, the database was also changed by
+    something else, so the store is marked to be rebuilt instead.
+
+    Parameters:
+    dict store: The state of the store, as returned by NewStore().
+    dict event: An event, as passed to subscribers.
+    function apply: A function that updates the store's data with an
+    event.
+
+    Returns:
+    bool: True if the event was applied, otherwise False.
+    """
+
+    if not store["Loaded"] or LoggedBefore(event, store["Offset"]):
+        return False
+    if event.get("Database") not in store["Databases"]:
+        return False
+    i = store["Databases"].index(event["Database"])
+    if event.get("OldVersion") != store["Versions"][i]:
+        store["Loaded"] = False
+        return False
+
+    apply(event)
+    store["Versions"][i] = event["NewVersion"]
+    return True
+
+# ----------------------------------------------------------------------
+
+def TailEvents():
+    """
+    Sends the events logged by other processes since the last call to
+    the subscribers in this process, so that their data includes changes
+    made by other processes without re-reading the databases.
+    Subscribers should ignore events logged before they last rebuilt
+    their data, using LoggedBefore().
+
+    Parameters:
+    None
+
+    Returns:
+    int: The number of events received from other processes.
+    """
+
+    global _logOffset
+
+    if GetLogOffset() < _logOffset:
+        _logOffset = 0 # The log has been deleted
+
+    events, _logOffset = ReadEvents(_logOffset)
+    received = 0
+    for event in events:
+        if event.get("PID") == os.getpid():
+            continue # Already sent to subscribers when published
+        _Dispatch(event)
+        received += 1
+    return received
+
+# ----------------------------------------------------------------------
+
+def TrimLog(offset):
+    """
+    Removes the events logged before a position from the Event Log so
+    that it doesn't keep growing. The remaining events keep their
+    positions, so positions from GetLogOffset() and ReadEvents() are
+    still valid after trimming.
+    This is safe to run while other processes are using the log. A
+    process that hasn't read the trimmed events yet, or publishes an
+    event while the log is being rewritten, loses those events, but
+    every module checks the database versions in the events it applies
+    and rebuilds its data from the databases when one is missing.
+
+    Parameters:
+    int offset: The position to trim the log up to, e.g. the Event
+    Offset in the watermark of the saved store report.
+
+    Returns:
+    int: The number of bytes removed from the log.
+    """
+
+    try:
+        f = open(EVENT_LOG, "rb")
+    except OSError:
+        return 0
+    base, headerSize = _LogStart(f)
+    f.seek(headerSize)
+    data = f.read()
+    f.close()
+
+    cut = min(offset - base, len(data))
+    if cut > 0 and data[cut - 1:cut] != b"\n":
+        cut = data.rfind(b"\n", 0, cut) + 1 # Only remove whole events
+    if cut <= 0:
+        return 0
+
+    header = {"Type": TRIMMED, "Base": base + cut}
+    tempFile = EVENT_LOG + ".tmp"
+    try:
+        f = open(tempFile, "wb")
+    except OSError as e:
+        print(f"An error occurred: {e}")
+        return 0
+    try:
+        f.write(json.dumps(header).encode() + b"\n")
+        f.write(data[cut:])
+        f.close()
+        os.replace(tempFile, EVENT_LOG)
+    except Exception as e:
+        f.close()
+        print(f"An error occurred: {e}")
+        return 0
+    return cut
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    # Print every event to the console as it is published
+    def PrintEvent(event):
+        print(event)
+
+    Subscribe(REVIEWED, PrintEvent)
+    logEvents = False # Don't add the example event to the log
+    Publish(REVIEWED, GameID="fifa07", Rating=4, Comment="Great!")
+
+    # Print the events in the log
+    events, _ = ReadEvents(0)
+    print(f"{len(events)} events in the log")
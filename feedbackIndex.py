@@ -0,0 +1,196 @@
+"""
+Feedback Index module - feedbackIndex.py
+
+This module keeps an in-memory index of the Game Feedback database
+so that per-game review stats and comment searches don't need a full
+scan of the database every time they are requested.
+The index is built from the database on first use, and is kept up to
+date from the REVIEWED events published when feedback is added.
+
+Functions:
+- LoadIndex(): Builds the index from the Game Feedback database if it
+hasn't been built yet or the database has changed on disk.
+- GetReviewStats(gameID): Returns the number of reviews, rating total,
+average score and rating histogram of a copy of a game.
+- SearchComments(query): Returns the IDs of all games with reviews
+that mention every word in the query.
+"""
+
+# Last Updated: 19/10/2026
+
+import eventBus as eb
+import csv
+import re
+
+# ----------------------------------------------------------------------
+# Index data
+# ----------------------------------------------------------------------
+
+FEEDBACK_DATABASE = "Game_Feedback.txt"
+
+_gameStats = {} # Game ID -> [number of reviews, rating total, histogram]
+_tokenIndex = {} # Comment word -> set of game IDs whose reviews use it
+_store = eb.NewStore([FEEDBACK_DATABASE])
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def _Tokenize(comment):
+    """
+    Splits a comment into a set of lowercase words.
+    """
+
+    return set(re.findall(r"[a-z0-9']+", comment.lower()))
+
+# ----------------------------------------------------------------------
+
+def _AddToIndex(gameID, rating, comment):
+    """
+    Adds a single review to the stats and comment word index. Returns
+    False without adding it if the rating is not from 1-5.
+    """
+
+    if rating < 1 or rating > 5:
+        return False
+    if gameID not in _gameStats:
+        _gameStats[gameID] = [0, 0, [0, 0, 0, 0, 0]]
+    stats = _gameStats[gameID]
+    stats[0] += 1
+    stats[1] += rating
+    stats[2][rating - 1] += 1
+
+    for token in _Tokenize(comment):
+        if token not in _tokenIndex:
+            _tokenIndex[token] = set()
+        _tokenIndex[token].add(gameID)
+    return True
+
+# ----------------------------------------------------------------------
+
+def LoadIndex():
+    """
+    Builds the index from the Game Feedback database. The database is
+    only read if the index hasn't been built yet or the database has
+    been modified since it was indexed.
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+
+    if not eb.NeedsBuild(_store):
+        return # Index is already up to date
+
+    _gameStats.clear()
+    _tokenIndex.clear()
+    try:
+        f = open(FEEDBACK_DATABASE, "r", newline="")
+    except OSError as e:
+        print(f"An error occurred: {e}")
+        return
+    try:
+        # Feedback is written with the csv module, so comments may be
+        # quoted and contain commas or line breaks
+        for entryList in csv.reader(f):
+            if len(entryList) < 2 or entryList[0] == "GameID":
+                continue # Ignore blank lines and the header
+            comment = ",".join(entryList[2:])
+            try:
+                rating = int(entryList[1])
+            except ValueError:
+                continue # Ignore entries without a valid rating
+            _AddToIndex(entryList[0], rating, comment)
+        f.close()
+    except Exception as e:
+        f.close()
+        # Don't leave a half-built index to be used
+        _gameStats.clear()
+        _tokenIndex.clear()
+        print(f"An error occurred: {e}")
+        return
+
+    eb.FinishBuild(_store)
+
+# ----------------------------------------------------------------------
+
+def _AddReview(event):
+    """
+    Adds the feedback in a REVIEWED event to the index.
+    """
+
+    _AddToIndex(event["GameID"], int(event["Rating"]), event["Comment"])
+
+def _OnReviewed(event):
+    """
+    Updates the index when a REVIEWED event is published. Does nothing
+    if the index hasn't been built yet, as it will include the feedback
+    when it is.
+    """
+
+    eb.ApplyEvent(_store, event, _AddReview)
+
+eb.Subscribe(eb.REVIEWED, _OnReviewed)
+
+# ----------------------------------------------------------------------
+
+def GetReviewStats(gameID):
+    """
+    Gets the review stats of a copy of a game.
+
+    Parameters:
+    string gameID: The ID of the copy of the game.
+
+    Returns:
+    dict: A dictionary containing the number of reviews, the total
+    of all ratings, the average score (0 if there are no reviews) and
+    a list counting how many of each rating from 1-5 the game has.
+    """
+
+    LoadIndex()
+    reviews, ratingTotal, histogram = _gameStats.get(gameID,
+                                                     [0, 0, [0]*5])
+    avgScore = ratingTotal / reviews if reviews > 0 else 0.0
+    return {"Reviews": reviews,
+            "Rating Total": ratingTotal,
+            "Avg. Score": avgScore,
+            "Histogram": list(histogram)}
+
+# ----------------------------------------------------------------------
+
+def SearchComments(query):
+    """
+    Finds all games with reviews mentioning every word in the query.
+
+    Parameters:
+    string query: One or more words to search for in review comments.
+
+    Returns:
+    set: The IDs of all matching games.
+    """
+
+    LoadIndex()
+    tokens = _Tokenize(query)
+    if not tokens:
+        return set()
+
+    # Intersect starting from the rarest word to keep the sets small
+    matchSets = sorted((_tokenIndex.get(t, set()) for t in tokens), key=len)
+    found = set(matchSets[0])
+    for matches in matchSets[1:]:
+        found &= matches
+    return found
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    # Show review stats for a game
+    print(GetReviewStats("fifa09"))
+
+    # Find games whose reviews mention a word
+    print(SearchComments("fun"))
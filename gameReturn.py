@@ -11,10 +11,11 @@ currently being rented.
 a returned game and adds it to the Game Feedback database.
 """
 
-# Last Updated: 11/12/2023
+# Last Updated: 19/10/2026
 
 import database as db
 import feedbackManager as fm
+import eventBus as eb
 from datetime import date
 
 # ----------------------------------------------------------------------
@@ -73,7 +74,11 @@ def AddFeedback(gameID, rating, comment):
     if rating < 1 or rating > 5:
         return "Error: rating must be a number from 1-5"
     
+    oldVersion = db.GetVersion("Game_Feedback.txt")
     fm.add_feedback(gameID, rating, comment)
+    eb.Publish(eb.REVIEWED, GameID=gameID, Rating=rating, Comment=comment,
+               Database="Game_Feedback.txt", OldVersion=oldVersion,
+               NewVersion=db.GetVersion("Game_Feedback.txt"))
     return f"Added feedback for {gameID}"
 
 
@@ -8,16 +8,88 @@ Functions:
 - searchGames(column, item): Returns a list of lists, each 
 list contains the game info and rental history of one game with
 the matching item in title, genre or platform.
+- QueryGames(...): Returns one page of games matching a combination
+of filters, sorted by a column, and a cursor for the next page.
 """
 
-# Last Updated: 12/12/2023
+# Last Updated: 19/10/2026
 
 import database as db
+import eventBus as eb
+import heapq
+import queryCache as qc
+
+# Columns of the Game Info database that results can be sorted by
+SORT_COLUMNS = ["GameID", "Platform", "Genre", "Title",
+                "Publisher", "PurchaseDate"]
+
+_rentedIDs = set() # IDs of all copies currently being rented
+_rentedStore = eb.NewStore(["Rental.txt"])
 
 # ----------------------------------------------------------------------
 # Functions
 # ----------------------------------------------------------------------
 
+def _GetRentedIDs():
+    """
+    Returns a set of the IDs of all copies currently being rented.
+    The set is built in a single pass over the Rental database the first
+    time it is needed, or if the database has changed on disk, and is
+    kept up to date from rental events after that.
+    """
+
+    if not eb.NeedsBuild(_rentedStore):
+        return _rentedIDs
+
+    rentals = db.GetLatestRentals()
+    if rentals == None:
+        return set()
+    latestRentals, _ = rentals
+    _rentedIDs.clear()
+    _rentedIDs.update(id for id in latestRentals
+                      if latestRentals[id][2] == "")
+
+    eb.FinishBuild(_rentedStore)
+    return _rentedIDs
+
+# ----------------------------------------------------------------------
+
+def _ApplyRentalChange(event):
+    """
+    Adds or removes the copy in a rental event from the set.
+    """
+
+    if event["Type"] == eb.RENTED:
+        _rentedIDs.add(event["GameID"])
+    else:
+        _rentedIDs.discard(event["GameID"])
+
+def _OnRentalChange(event):
+    """
+    Updates the set of rented copies when a copy is rented, returned
+    or has its rental history deleted. If the Rental database was also
+    changed by something else, the set is rebuilt when next needed.
+    """
+
+    eb.ApplyEvent(_rentedStore, event, _ApplyRentalChange)
+
+eb.Subscribe(eb.RENTED, _OnRentalChange)
+eb.Subscribe(eb.RETURNED, _OnRentalChange)
+eb.Subscribe(eb.PRUNED, _OnRentalChange)
+
+# ----------------------------------------------------------------------
+
+def _RentalStatus(gameID, rentedIDs):
+    """
+    Returns the rental status string shown for a copy of a game.
+    """
+
+    if gameID in rentedIDs:
+        return "Not available to rent"
+    return "Avaiable to rent"
+
+# ----------------------------------------------------------------------
+
 def searchGames(column, item):
     """
     This function returns the game info and rental info of all games
@@ -34,6 +106,16 @@ def searchGames(column, item):
     None: If an error occurs during operation.
     """
 
+    # Repeated searches are cached until a database changes
+    return qc.CachedCall(_RunSearch, column, item)
+
+# ----------------------------------------------------------------------
+
+def _RunSearch(column, item):
+    """
+    Searches the databases for entries, as returned by searchGames().
+    """
+
     if column == "Platform":
         i = 1
     elif column == "Genre":
@@ -42,6 +124,7 @@ def searchGames(column, item):
         i = 3
 
     gameData = db.GetDatabase("Game_Info.txt")
+    rentedIDs = _GetRentedIDs()
 
     # Get a list of info for all found entries
     gameList = []
@@ -49,12 +132,7 @@ def searchGames(column, item):
         gameInfo = entry
         if not item.lower() in gameInfo[i].lower():
             continue # Ignore unmatching entries
-        lastRent = db.GetEntry(entry[0])[-1][1]
-        if lastRent == "":
-            available = "Not available to rent"
-        else:
-            available = "Avaiable to rent"
-        gameInfo.append(available)
+        gameInfo.append(_RentalStatus(entry[0], rentedIDs))
         gameList.append(gameInfo)
 
     # Check that search returns entries
@@ -63,6 +141,95 @@ def searchGames(column, item):
 
     return gameList
 
+# ----------------------------------------------------------------------
+
+def QueryGames(platform="", genre="", title="", purchasedFrom="",
+               purchasedTo="", available=None, sortBy="GameID",
+               descending=False, limit=20, cursor=None):
+    """
+    Finds all games matching every given filter and returns a single
+    page of them, sorted by the given column. The cursor holds the sort
+    key of the last entry on the previous page, so only the entries of
+    the requested page are ordered, however far into the results it is.
+
+    Parameters:
+    string platform: Text that must appear in the platform, or "".
+    string genre: Text that must appear in the genre, or "".
+    string title: Text that must appear in the title, or "".
+    string purchasedFrom: Earliest purchase date (YYYY-MM-DD), or "".
+    string purchasedTo: Latest purchase date (YYYY-MM-DD), or "".
+    bool available: True for only available games, False for only
+    rented games, or None for both.
+    string sortBy: The column to sort by, one of SORT_COLUMNS.
+    bool descending: If true, sorts from highest to lowest.
+    int limit: The maximum number of entries to return, at least 1.
+    tuple cursor: The cursor returned by the previous call for the
+    previous page, or None for the first page.
+
+    Returns:
+    tuple: A list of entries in the same format as searchGames(),
+    and the cursor for the next page, or None if this is the last page.
+    """
+
+    if sortBy not in SORT_COLUMNS:
+        print(f"An error occurred: cannot sort by {sortBy}")
+        return [], None
+    if limit < 1:
+        print(f"An error occurred: limit must be at least 1, not {limit}")
+        return [], None
+    sortIndex = SORT_COLUMNS.index(sortBy)
+
+    gameData = db.GetDatabase("Game_Info.txt")
+    if gameData == None:
+        return [], None
+    rentedIDs = _GetRentedIDs()
+
+    # Filters on text columns, as (column index, lowercase search text)
+    textFilters = [(1, platform.lower()), (2, genre.lower()),
+                   (3, title.lower())]
+    textFilters = [(i, text) for i, text in textFilters if text != ""]
+
+    def Matches(entry):
+        if len(entry) < len(SORT_COLUMNS):
+            return False # Ignore blank or incomplete lines
+        for i, text in textFilters:
+            if text not in entry[i].lower():
+                return False
+        if purchasedFrom != "" and entry[5] < purchasedFrom:
+            return False
+        if purchasedTo != "" and entry[5] > purchasedTo:
+            return False
+        if available != None and (entry[0] not in rentedIDs) != available:
+            return False
+        return True
+
+    def SortKey(entry):
+        return (entry[sortIndex].lower(), entry[0])
+
+    def AfterCursor(entry):
+        if cursor == None:
+            return True
+        if descending:
+            return SortKey(entry) < tuple(cursor)
+        return SortKey(entry) > tuple(cursor)
+
+    # Keep only the entries of this page, plus one more to check whether
+    # there is another page after it
+    matches = (entry for entry in gameData
+               if AfterCursor(entry) and Matches(entry))
+    if descending:
+        topEntries = heapq.nlargest(limit + 1, matches, key=SortKey)
+    else:
+        topEntries = heapq.nsmallest(limit + 1, matches, key=SortKey)
+
+    page = topEntries[:limit]
+    nextCursor = None
+    if len(topEntries) > limit:
+        nextCursor = SortKey(page[-1])
+    for entry in page:
+        entry.append(_RentalStatus(entry[0], rentedIDs))
+    return page, nextCursor
+
 # ----------------------------------------------------------------------
 # MAIN CODE
 # ----------------------------------------------------------------------
@@ -72,4 +239,16 @@ if __name__ == "__main__":
     # Search for results using a vague keyword
     results = searchGames("Title","deep")
     for entry in results:
-        print(entry[0])
\ No newline at end of file
+        print(entry[0])
+
+    print("-"*100)
+
+    # Page through available PlayStation games, newest purchases first
+    cursor = None
+    while True:
+        results, cursor = QueryGames(platform="PlayStation", available=True,
+                                     sortBy="PurchaseDate", descending=True,
+                                     limit=5, cursor=cursor)
+        print([entry[0] for entry in results])
+        if cursor == None:
+            break
\ No newline at end of file
@@ -3,8 +3,18 @@ Inventory Pruning module - inventoryPruning.py
 
 This module contains functions that determine which games are
 unpopular based on feedback criteria.
+The stats of each game are built from the databases on first use and
+kept up to date from the events published when the databases change.
 
 Functions:
+- GetGameStats(): Returns the stats of every game used to find
+unpopular games.
+- ApplyStatsEvent(gameStats, totals, event): Updates game stats with
+a change published by the event bus.
+- CalculateAverages(gameStats, totals): Calculates averages from
+game stats.
+- FindUnpopularIn(gameStats, averages): Finds unpopular games from
+game stats.
 - GetAverages(): Calculates the average number of times rented,
 number of reviews and average review score across all games.
 - FindUnpopular(averages): Calculates which games are 'unpopular' by
@@ -18,123 +28,222 @@ a bar chart of the game's stats against the average stats.
 the database and optionally also deletes its rental history.
 """
 
-# Last Updated: 12/12/2023
+# Last Updated: 19/10/2026
 
 import database as db
-import feedbackManager as fm
+import eventBus as eb
+import feedbackIndex as fi
 from datetime import date
-import matplotlib.pyplot as plt
+
+# ----------------------------------------------------------------------
+# Game stats data
+# ----------------------------------------------------------------------
+
+# Databases the game stats are built from
+STATS_DATABASES = ["Game_Info.txt", "Rental.txt", "Game_Feedback.txt"]
+
+# Game ID -> dictionary of the stats of each game in Game Info
+_gameStats = {}
+# Totals across all games of the number of rents, number of reviews and
+# average score, and the number of games that have reviews
+_totals = [0, 0, 0.0, 0]
+_statsStore = eb.NewStore(STATS_DATABASES)
 
 # ----------------------------------------------------------------------
 # Functions
 # ----------------------------------------------------------------------
 
-def GetAverages():
+def _AddToTotals(totals, stats, sign):
+    """
+    Adds (sign 1) or removes (sign -1) a game's stats from the totals.
     """
-    Calculates the average number of times rented, number of reviews
-    and review score across all games.
 
-    Parameters:
-    None
+    totals[0] += sign * stats["Rents"]
+    totals[1] += sign * stats["Reviews"]
+    if stats["Reviews"] > 0:
+        totals[2] += sign * stats["Rating Total"] / stats["Reviews"]
+        totals[3] += sign
 
-    Returns:
-    tuple: a 3-ary tuple containing the average number of rents,
-    average number of reviews and average review score.
+# ----------------------------------------------------------------------
+
+def _NewGameStats(game):
+    """
+    Returns the stats of a game that hasn't been rented or reviewed yet.
+    """
+
+    return {"Rents" : 0,
+            "Reviews" : 0,
+            "Rating Total" : 0,
+            "Last Return" : None,
+            "Purchase Date" : game[5]}
+
+# ----------------------------------------------------------------------
+
+def _LoadStats():
     """
+    Builds the stats of every game from the databases. The databases
+    are only read if the stats haven't been built yet or the databases
+    have been modified since they were read.
+    """
+
+    if not eb.NeedsBuild(_statsStore):
+        return # Stats are already up to date
 
-    statsDict = {}
-    avgList = [0,0,0]
+    _gameStats.clear()
+    _totals[:] = [0, 0, 0.0, 0]
 
     # Populate dictionary of stats for each game
     gameData = db.GetDatabase("Game_Info.txt")
     for game in gameData:
-        statsDict.update({game[0] : [0,0,0]})
-    
-    # Count the number of times each game has been rented
-    rentalData = db.GetDatabase("Rental.txt")
-    for rental in rentalData:
-        id = rental[0]
-        if id not in statsDict.keys():
-            continue
-        statsDict[id][0] += 1
-
-    # Count the number of reviews for each game
-    # and calculate average review score for each game
-    feedbackData = fm.load_feedback()
-    for review in feedbackData:
-        id = review["GameID"]
-        if id not in statsDict.keys():
-            continue
-        if id == "GameID":
+        if len(game) < 6:
+            continue # Ignore blank or incomplete lines
+        _gameStats.update({game[0] : _NewGameStats(game)})
+        reviewStats = fi.GetReviewStats(game[0])
+        _gameStats[game[0]]["Reviews"] = reviewStats["Reviews"]
+        _gameStats[game[0]]["Rating Total"] = reviewStats["Rating Total"]
+
+    # Count the number of times each game has been rented and keep the
+    # return date of its latest rental
+    latestRentals, rentCounts = db.GetLatestRentals()
+    for id in latestRentals:
+        if id not in _gameStats.keys():
             continue
-        statsDict[id][1] += 1
-        statsDict[id][2] += review["Rating"] # Add score for mean
-
-    total = 0
-    nonZeroTotal = 0 # Total number of games that have reviews
-    for s in statsDict:
-        # Divide total score by number of reviews to find average score
-        if statsDict[s][1] == 0:
-            statsDict[s][2] = 0
-        else:
-            statsDict[s][2] = statsDict[s][2] / statsDict[s][1]
+        _gameStats[id]["Rents"] = rentCounts[id]
+        _gameStats[id]["Last Return"] = latestRentals[id][2]
+
+    for id in _gameStats:
+        _AddToTotals(_totals, _gameStats[id], 1)
 
-        # Add up the totals for number of rents and reviews, and review score
-        for i in range(0,3):
-            avgList[i] += statsDict[s][i]
+    eb.FinishBuild(_statsStore)
 
-        total += 1
-        if statsDict[s][1] != 0:
-            nonZeroTotal += 1
+# ----------------------------------------------------------------------
+
+def ApplyStatsEvent(gameStats, totals, event):
+    """
+    Applies a published change to the stats of the games it affects
+    and to the totals, instead of rebuilding all of the stats.
+
+    Parameters:
+    dict gameStats: The stats of each game, as returned by GetGameStats().
+    list totals: The totals across games, as returned by GetGameStats().
+    dict event: An event published by the event bus.
+
+    Returns:
+    None
+    """
+
+    if event["Type"] == eb.STOCKED:
+        # Reviews of new copies are added by their own REVIEWED events,
+        # which may already be in the feedback index if this event is
+        # applied late, so they aren't read from it here
+        for game in event["Entries"]:
+            if game[0] in gameStats:
+                continue
+            gameStats.update({game[0] : _NewGameStats(game)})
+            _AddToTotals(totals, gameStats[game[0]], 1)
+        return
+
+    id = event["GameID"]
+    if id not in gameStats:
+        return
+    stats = gameStats[id]
+    _AddToTotals(totals, stats, -1)
+
+    if event["Type"] == eb.RENTED:
+        stats["Rents"] += 1
+        stats["Last Return"] = ""
+    elif event["Type"] == eb.RETURNED:
+        stats["Last Return"] = event["Date"]
+    elif event["Type"] == eb.REVIEWED:
+        stats["Reviews"] += 1
+        stats["Rating Total"] += int(event["Rating"])
+    elif event["Database"] == "Rental.txt":
+        stats["Rents"] = 0
+        stats["Last Return"] = None
+    elif event["Database"] == "Game_Info.txt":
+        gameStats.pop(id)
+        return
+
+    _AddToTotals(totals, stats, 1)
+
+# ----------------------------------------------------------------------
+
+def _ApplyToStats(event):
+    """
+    Applies a published change to the stats kept by this module.
+    """
+
+    ApplyStatsEvent(_gameStats, _totals, event)
+
+def _OnStatsEvent(event):
+    """
+    Applies a published change to the stats if they have been built
+    and don't already include it. If the database was also changed by
+    something else, the stats are rebuilt the next time they are used
+    instead.
+    """
+
+    eb.ApplyEvent(_statsStore, event, _ApplyToStats)
+
+for eventType in [eb.RENTED, eb.RETURNED, eb.REVIEWED, eb.PRUNED,
+                  eb.STOCKED]:
+    eb.Subscribe(eventType, _OnStatsEvent)
+
+# ----------------------------------------------------------------------
+
+def CalculateAverages(gameStats, totals):
+    """
+    Calculates the averages across games from their stats.
+
+    Parameters:
+    dict gameStats: The stats of each game, as returned by GetGameStats().
+    list totals: The totals across games, as returned by GetGameStats().
+
+    Returns:
+    tuple: The averages, as returned by GetAverages().
+    """
 
-    # Divide each value by the number of entries in the dictionary
-    avgList[0] = avgList[0] / total
-    avgList[1] = avgList[1] / total
-    avgList[2] = avgList[2] / nonZeroTotal
+    # Divide each total by the number of games, or the number of
+    # reviewed games for the average score
+    total = len(gameStats)
+    if total == 0:
+        return (0, 0, 0)
+    avgRents = totals[0] / total
+    avgRevs = totals[1] / total
+    avgScore = totals[2] / totals[3] if totals[3] > 0 else 0
 
-    avgTuple = (avgList[0],avgList[1],avgList[2])
+    avgTuple = (avgRents, avgRevs, avgScore)
     return avgTuple
 
 # ----------------------------------------------------------------------
 
-def FindUnpopular(averages):
+def FindUnpopularIn(gameStats, averages):
     """
-    This function determines which games are unpopular based on their
-    average score and how long it has been since the game has been rented.
+    Finds the unpopular games from the stats of each game.
 
     Parameters:
-    tuple averages: A 3-ary tuple containing average stats across
-    games, as returned by GetAverages().
+    dict gameStats: The stats of each game, as returned by GetGameStats().
+    tuple averages: The averages across games, as returned by
+    GetAverages() or CalculateAverages().
 
     Returns:
-    dict: A dictionary of IDs as keys and then a sub-dictionary
-    containing number of reviews, average review score and
-    number of times rented for unpopular games.
+    dict: The unpopular games, as returned by FindUnpopular().
     """
 
     unpopularGames = {}
 
     avgRents, _, avgScore = averages # average review number is not used here
 
-    gameData = db.GetDatabase("Game_Info.txt")
-    feedbackData = fm.load_feedback()
-    for entry in gameData:
-        id = entry[0]
-        if id == "GameID":
-            continue
+    for id in gameStats:
+        stats = gameStats[id]
         score = 0
 
         # Add score for low ratings
-        revs = 0
-        avgGameScore = 0.0
-        for entry in feedbackData:
-            if entry["GameID"] == id:
-                revs += 1
-                avgGameScore += entry["Rating"]
+        revs = stats["Reviews"]
         if revs == 0:
             avgGameScore = 0.0
         else:
-            avgGameScore = avgGameScore / revs
+            avgGameScore = stats["Rating Total"] / revs
 
         if avgGameScore == 0:
             None # Don't add score for unreviewed games
@@ -144,23 +253,18 @@ def FindUnpopular(averages):
             score += 1
 
         # Add score based on rental history
-        gameInfo = db.GetEntry(id)
-        rents = len(gameInfo) - 1
+        rents = stats["Rents"]
         # Don't add if game has never been rented as it's probably new
         if rents == 0:
             None
         elif rents < avgRents:
             score += 1
-        lastRental = gameInfo[-1]
-        dateList = lastRental[1].split("-")
-        if dateList == [""]:
+        if stats["Last Return"] == "":
             daysSinceRented = 0
         elif rents == 0:
             daysSinceRented = "N/A"
         elif rents > 0:
-            for i in range(0,3):
-                dateList[i] = int(dateList[i])
-            lastReturnDate = date(*dateList)
+            lastReturnDate = date.fromisoformat(stats["Last Return"])
             daysSinceRented = (date.today() - lastReturnDate).days
 
             # Add score if game hasn't been rented in 30 or 14 days
@@ -170,11 +274,7 @@ def FindUnpopular(averages):
                 score += 1
 
         # Get days since purchased
-        dateStr = gameInfo[0][5]
-        dateList = dateStr.split("-")
-        for i in range(0,3):
-            dateList[i] = int(dateList[i])
-        purchaseDate = date(*dateList)
+        purchaseDate = date.fromisoformat(stats["Purchase Date"])
         daysOwned = (date.today() - purchaseDate).days
 
         # Add games with high score to the list of unpopular games
@@ -185,7 +285,68 @@ def FindUnpopular(averages):
                                   "Last Rent" : daysSinceRented,
                                   "Purchased" : daysOwned}})
 
-    return unpopularGames      
+    return unpopularGames
+
+# ----------------------------------------------------------------------
+
+def GetGameStats():
+    """
+    Gets the stats of every game used to calculate averages and find
+    unpopular games.
+
+    Parameters:
+    None
+
+    Returns:
+    tuple: A dictionary of game IDs as keys and a sub-dictionary of
+    the number of rents, number of reviews, total review score, latest
+    return date ("" if being rented, None if never rented) and purchase
+    date of each game, and a list of totals across all games.
+    """
+
+    _LoadStats()
+    gameStats = {}
+    for id in _gameStats:
+        gameStats.update({id : dict(_gameStats[id])})
+    return gameStats, list(_totals)
+
+# ----------------------------------------------------------------------
+
+def GetAverages():
+    """
+    Calculates the average number of times rented, number of reviews
+    and review score across all games.
+
+    Parameters:
+    None
+
+    Returns:
+    tuple: a 3-ary tuple containing the average number of rents,
+    average number of reviews and average review score.
+    """
+
+    _LoadStats()
+    return CalculateAverages(_gameStats, _totals)
+
+# ----------------------------------------------------------------------
+
+def FindUnpopular(averages):
+    """
+    This function determines which games are unpopular based on their
+    average score and how long it has been since the game has been rented.
+
+    Parameters:
+    tuple averages: A 3-ary tuple containing average stats across
+    games, as returned by GetAverages().
+
+    Returns:
+    dict: A dictionary of IDs as keys and then a sub-dictionary
+    containing number of reviews, average review score and
+    number of times rented for unpopular games.
+    """
+
+    _LoadStats()
+    return FindUnpopularIn(_gameStats, averages)
 
 # ----------------------------------------------------------------------
 
@@ -273,6 +434,9 @@ def DrawBarChart(gameID, gameInfo, averages):
     Returns:
     None: Displays a bar chart of relevant data.
     """
+
+    # Only import matplotlib when a chart is drawn, as it is slow to import
+    import matplotlib.pyplot as plt
  
     gameRents = gameInfo["Rents"]
     gameRevs = gameInfo["Reviews"]
@@ -0,0 +1,349 @@
+"""
+Load Test module - loadTest.py
+
+This module runs several worker processes that rent, return, review
+and search games at the same time, to show how the system behaves when
+several counters use it at once. The workers run against a copy of the
+databases, so the real databases are never changed. The subscriptions
+in the copy are extended to end in the future, as the sample
+subscriptions have all ended and every rent would otherwise be refused.
+
+After the workers finish, the copied databases are checked for:
+- copies with more than one open rental,
+- rental entries lost, i.e. fewer rentals than successful rents,
+- returns lost, i.e. more open rentals than expected,
+- feedback lost, i.e. fewer reviews than successful submissions.
+A test in which no rents succeed is also reported as a problem, as it
+hasn't tested rentals at all.
+
+Functions:
+- RunLoadTest(workers, operations, mix, hotGames, dataDir, seed, keep):
+Runs the load test and returns its results.
+- FormatReport(report): Formats the results of a load test as text.
+"""
+
+# Last Updated: 19/10/2026
+
+import database as db
+import gameRent as gRent
+import gameReturn as gReturn
+import gameSearch as gSearch
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+# ----------------------------------------------------------------------
+# Load test data
+# ----------------------------------------------------------------------
+
+DATA_FILES = ["Game_Info.txt", "Rental.txt", "Game_Feedback.txt",
+              "Subscription_Info.txt"]
+
+# Share of operations of each type run by each worker
+DEFAULT_MIX = {"RentGame": 0.35, "ReturnGame": 0.35,
+               "AddFeedback": 0.1, "searchGames": 0.2}
+
+SEARCH_TERMS = [("Title", "cod"), ("Title", "craft"), ("Genre", "rpg"),
+                ("Platform", "pc"), ("Title", "")]
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def _CountRows(database):
+    """
+    Returns the number of entries in a database, not counting the header.
+    """
+
+    f = open(database, "r")
+    count = 0
+    for entry in f:
+        if entry.strip() != "" and not entry.startswith("GameID"):
+            count += 1
+    f.close()
+    return count
+
+# ----------------------------------------------------------------------
+
+def _ExtendSubscriptions(days):
+    """
+    Sets the end date of every subscription in the Subscription Info
+    database to the given number of days after today.
+    """
+
+    endDate = str(date.today() + timedelta(days=days))
+    f = open("Subscription_Info.txt", "r", newline="")
+    lines = f.readlines()
+    f.close()
+
+    fileStr = ""
+    for line in lines:
+        entry = line.rstrip("\r\n")
+        columns = entry.split(",")
+        if columns[0] != "CustomerID" and len(columns) == 4:
+            columns[3] = endDate
+        fileStr = fileStr + ",".join(columns) + line[len(entry):]
+
+    f = open("Subscription_Info.txt", "w", newline="")
+    f.write(fileStr)
+    f.close()
+
+# ----------------------------------------------------------------------
+
+def _CountOpenRentals():
+    """
+    Returns a dictionary of game IDs and their number of open rentals.
+    """
+
+    openRentals = {}
+    for rental in db.GetDatabase("Rental.txt"):
+        if len(rental) > 2 and rental[2] == "":
+            openRentals[rental[0]] = openRentals.get(rental[0], 0) + 1
+    return openRentals
+
+# ----------------------------------------------------------------------
+
+def _Worker(dataDir, mix, operations, gameIDs, customerIDs, seed, results):
+    """
+    Runs a number of randomly chosen operations against the databases
+    in dataDir and puts a list of (operation, seconds, message) tuples
+    on the results queue.
+    """
+
+    os.chdir(dataDir) # All modules use database paths relative to here
+
+    rng = random.Random(seed)
+    opNames = list(mix.keys())
+    weights = [mix[name] for name in opNames]
+
+    timings = []
+    try:
+        _RunOperations(rng, opNames, weights, operations, gameIDs,
+                       customerIDs, timings)
+    finally:
+        # Always send the timings so the main process doesn't wait forever
+        results.put(timings)
+
+# ----------------------------------------------------------------------
+
+def _RunOperations(rng, opNames, weights, operations, gameIDs, customerIDs,
+                   timings):
+    """
+    Runs randomly chosen operations, adding an (operation, seconds,
+    message) tuple to timings for each one.
+    """
+
+    for i in range(0, operations):
+        op = rng.choices(opNames, weights)[0]
+        gameID = rng.choice(gameIDs)
+        renterID = rng.choice(customerIDs)
+        start = time.perf_counter()
+        try:
+            if op == "RentGame":
+                message = gRent.RentGame(renterID, gameID)
+            elif op == "ReturnGame":
+                message = gReturn.ReturnGame(gameID)
+            elif op == "AddFeedback":
+                message = gReturn.AddFeedback(gameID, rng.randint(1, 5),
+                                              "Load test")
+            else:
+                column, item = rng.choice(SEARCH_TERMS)
+                found = gSearch.searchGames(column, item)
+                message = "No results" if found == None else "Found"
+        except Exception as e:
+            message = f"Error: {type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+
+        # Hide the IDs so that messages can be grouped in the report
+        message = message.replace(gameID, "<game>")
+        message = message.replace(f"to {renterID}", "to <customer>")
+        timings.append((op, seconds, message))
+
+# ----------------------------------------------------------------------
+
+def _Percentile(sortedValues, percent):
+    """
+    Returns the given percentile of a sorted list using nearest rank.
+    """
+
+    if sortedValues == []:
+        return 0
+    rank = max(1, round(percent / 100 * len(sortedValues)))
+    return sortedValues[min(rank, len(sortedValues)) - 1]
+
+# ----------------------------------------------------------------------
+
+def RunLoadTest(workers=4, operations=200, mix=None, hotGames=10,
+                dataDir=".", seed=None, keep=False):
+    """
+    Runs worker processes that perform a mix of operations at the same
+    time against a copy of the databases, then checks that the copied
+    databases are consistent.
+
+    Parameters:
+    int workers: The number of worker processes to run.
+    int operations: The number of operations each worker performs.
+    dict mix: The share of each operation, with keys RentGame,
+    ReturnGame, AddFeedback and searchGames. Defaults to DEFAULT_MIX.
+    int hotGames: The number of copies the workers rent, return and
+    review. A small number means more workers use the same copies.
+    string dataDir: The folder containing the databases to copy.
+    int seed: A seed for the random operations, or None.
+    bool keep: If true, the copied databases are not deleted.
+
+    Returns:
+    dict: The throughput, latency percentiles and message counts of each
+    operation, the consistency problems found, and where the copied
+    databases are if they were kept.
+    """
+
+    if mix == None:
+        mix = DEFAULT_MIX
+    if seed == None:
+        seed = random.randrange(1000000)
+
+    # Copy the databases so the real ones are never changed
+    testDir = tempfile.mkdtemp(prefix="loadtest_")
+    for database in DATA_FILES:
+        shutil.copy(os.path.join(dataDir, database), testDir)
+
+    startDir = os.getcwd()
+    os.chdir(testDir)
+    try:
+        _ExtendSubscriptions(365)
+        gameIDs = [game[0] for game in db.GetDatabase("Game_Info.txt")]
+        gameIDs = gameIDs[:hotGames]
+        subscriptionData = db.GetDatabase("Subscription_Info.txt")
+        customerIDs = [sub[0] for sub in subscriptionData
+                       if sub[0] != "CustomerID"]
+        rentalsBefore = _CountRows("Rental.txt")
+        feedbackBefore = _CountRows("Game_Feedback.txt")
+        openBefore = sum(_CountOpenRentals().values())
+
+        # Start every worker, then wait for all of their timings
+        results = multiprocessing.Queue()
+        processes = []
+        for i in range(0, workers):
+            p = multiprocessing.Process(target=_Worker,
+                                        args=(testDir, mix, operations,
+                                              gameIDs, customerIDs,
+                                              seed + i, results))
+            processes.append(p)
+        start = time.perf_counter()
+        for p in processes:
+            p.start()
+        timings = []
+        for p in processes:
+            timings = timings + results.get()
+        for p in processes:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        # Summarise the timings of each operation
+        opStats = {}
+        for op in mix:
+            latencies = sorted(t[1] * 1000 for t in timings if t[0] == op)
+            messages = {}
+            for t in timings:
+                if t[0] == op:
+                    messages[t[2]] = messages.get(t[2], 0) + 1
+            opStats.update({op : {"Count" : len(latencies),
+                                  "p50 (ms)" : _Percentile(latencies, 50),
+                                  "p95 (ms)" : _Percentile(latencies, 95),
+                                  "p99 (ms)" : _Percentile(latencies, 99),
+                                  "Messages" : messages}})
+
+        # Check the copied databases are consistent with what succeeded
+        rents = sum(1 for t in timings
+                    if t[0] == "RentGame" and t[2].startswith("Rented"))
+        returns = sum(1 for t in timings
+                      if t[0] == "ReturnGame" and t[2].startswith("Returned"))
+        reviews = sum(1 for t in timings
+                      if t[0] == "AddFeedback" and t[2].startswith("Added"))
+
+        problems = []
+        rentAttempts = sum(1 for t in timings if t[0] == "RentGame")
+        if rentAttempts > 0 and rents == 0:
+            problems.append(f"None of the {rentAttempts} rents succeeded, "
+                            "so rentals were not tested")
+        openRentals = _CountOpenRentals()
+        for id in openRentals:
+            if openRentals[id] > 1:
+                problems.append(f"{id} has {openRentals[id]} open rentals")
+        rentalsAfter = _CountRows("Rental.txt")
+        if rentalsAfter != rentalsBefore + rents:
+            problems.append(f"Expected {rentalsBefore + rents} rental "
+                            f"entries, found {rentalsAfter}")
+        openAfter = sum(openRentals.values())
+        if openAfter != openBefore + rents - returns:
+            problems.append(f"Expected {openBefore + rents - returns} open "
+                            f"rentals, found {openAfter}")
+        feedbackAfter = _CountRows("Game_Feedback.txt")
+        if feedbackAfter != feedbackBefore + reviews:
+            problems.append(f"Expected {feedbackBefore + reviews} reviews, "
+                            f"found {feedbackAfter}")
+    finally:
+        os.chdir(startDir)
+        if not keep:
+            shutil.rmtree(testDir, ignore_errors=True)
+
+    return {"Workers" : workers,
+            "Operations" : len(timings),
+            "Seconds" : elapsed,
+            "Throughput (ops/s)" : len(timings) / elapsed,
+            "Operation Stats" : opStats,
+            "Problems" : problems,
+            "Data" : testDir if keep else None}
+
+# ----------------------------------------------------------------------
+
+def FormatReport(report):
+    """
+    Formats the results of a load test as text.
+
+    Parameters:
+    dict report: The results of a load test, as returned by
+    RunLoadTest().
+
+    Returns:
+    string: The formatted results.
+    """
+
+    reportStr = (f"{report['Operations']} operations by "
+                 f"{report['Workers']} workers in "
+                 f"{report['Seconds']:.2f}s: "
+                 f"{report['Throughput (ops/s)']:.1f} ops/s\n")
+
+    stats = report["Operation Stats"]
+    for op in stats:
+        reportStr = reportStr + (f"{op}: {stats[op]['Count']} ops, "
+                                 f"p50 {stats[op]['p50 (ms)']:.1f} ms, "
+                                 f"p95 {stats[op]['p95 (ms)']:.1f} ms, "
+                                 f"p99 {stats[op]['p99 (ms)']:.1f} ms\n")
+        for message in stats[op]["Messages"]:
+            count = stats[op]["Messages"][message]
+            reportStr = reportStr + f"  {count} x {message}\n"
+
+    if report["Problems"] == []:
+        reportStr = reportStr + "Consistency check passed\n"
+    else:
+        reportStr = reportStr + "Consistency check FAILED:\n"
+        for problem in report["Problems"]:
+            reportStr = reportStr + f"  {problem}\n"
+    if report["Data"] != None:
+        reportStr = reportStr + f"Databases kept in {report['Data']}\n"
+    return reportStr.strip()
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    # Run 4 counters against the same 10 copies and report the results
+    report = RunLoadTest(workers=4, operations=200, hotGames=10)
+    print(FormatReport(report))
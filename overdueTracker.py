@@ -0,0 +1,245 @@
+"""
+Overdue Tracker module - overdueTracker.py
+
+This module keeps track of the due dates of all open rentals so that
+overdue copies can be found without scanning the whole rental history.
+Open rentals are kept in a list sorted by due date, built from the
+Rental database on first use and kept up to date from the RENTED,
+RETURNED and PRUNED events published by the database module.
+
+Functions:
+- GetLoanPeriod(subType): Returns the number of days a customer with the
+given subscription type can keep a rented copy.
+- LoadTracker(): Builds the list of open rentals from the Rental database
+if it hasn't been built yet or the database has changed on disk.
+- GetOverdue(asOf): Returns the open rentals that are overdue on a date.
+- GetDueSoon(days, asOf): Returns the open rentals due in the given
+number of days after a date.
+- OverdueReport(asOf): Returns the details of every overdue rental.
+"""
+
+# Last Updated: 19/10/2026
+
+import database as db
+import eventBus as eb
+import subscriptionManager as sm
+import bisect
+from datetime import date, timedelta
+
+# ----------------------------------------------------------------------
+# Tracker data
+# ----------------------------------------------------------------------
+
+# Number of days each subscription type can keep a rented copy for
+LOAN_PERIODS = {"Basic": 14, "Premium": 28}
+DEFAULT_LOAN_PERIOD = LOAN_PERIODS["Basic"]
+
+_dueList = [] # Sorted list of (due date, game ID) for open rentals
+_openRentals = {} # Game ID -> (due date, rent date, renter ID)
+_subscriptions = {} # Subscriptions used to work out loan periods
+_store = eb.NewStore(["Rental.txt"])
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def GetLoanPeriod(subType):
+    """
+    Gets the number of days a copy can be rented for.
+
+    Parameters:
+    string subType: The subscription type of the customer.
+
+    Returns:
+    int: The loan period in days.
+    """
+
+    return LOAN_PERIODS.get(subType, DEFAULT_LOAN_PERIOD)
+
+# ----------------------------------------------------------------------
+
+def _AddOpenRental(gameID, rentDate, renterID):
+    """
+    Works out the due date of a rental and adds it to the tracker.
+    """
+
+    global _subscriptions
+
+    # Reload subscriptions in case the customer has only just joined
+    if renterID not in _subscriptions:
+        _subscriptions = sm.load_subscriptions("Subscription_Info.txt")
+    subType = _subscriptions.get(renterID, {}).get("SubscriptionType")
+
+    dueDate = (date.fromisoformat(rentDate)
+               + timedelta(days=GetLoanPeriod(subType)))
+    _RemoveOpenRental(gameID) # A copy can only have one open rental
+    _openRentals[gameID] = (dueDate, rentDate, renterID)
+    bisect.insort(_dueList, (dueDate, gameID))
+
+# ----------------------------------------------------------------------
+
+def _RemoveOpenRental(gameID):
+    """
+    Removes the open rental of a copy from the tracker if present.
+    """
+
+    if gameID not in _openRentals:
+        return
+    dueDate = _openRentals.pop(gameID)[0]
+    i = bisect.bisect_left(_dueList, (dueDate, gameID))
+    if i < len(_dueList) and _dueList[i] == (dueDate, gameID):
+        del _dueList[i]
+
+# ----------------------------------------------------------------------
+
+def LoadTracker():
+    """
+    Builds the list of open rentals from the Rental database. The
+    database is only read if the tracker hasn't been built yet or the
+    database has been modified since it was read.
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+
+    global _subscriptions
+
+    if not eb.NeedsBuild(_store):
+        return # Tracker is already up to date
+
+    rentals = db.GetLatestRentals()
+    if rentals == None:
+        return
+    latestRental, _ = rentals
+
+    _dueList.clear()
+    _openRentals.clear()
+    _subscriptions = sm.load_subscriptions("Subscription_Info.txt")
+    for id in latestRental:
+        gameID, rentDate, returnDate, renterID = latestRental[id][:4]
+        if returnDate == "":
+            _AddOpenRental(gameID, rentDate, renterID)
+
+    eb.FinishBuild(_store)
+
+# ----------------------------------------------------------------------
+
+def _ApplyRented(event):
+    """
+    Adds the rental in a RENTED event to the tracker.
+    """
+
+    _AddOpenRental(event["GameID"], event["Date"], event["RenterID"])
+
+def _ApplyReturned(event):
+    """
+    Removes the rental of the copy in a RETURNED or PRUNED event.
+    """
+
+    _RemoveOpenRental(event["GameID"])
+
+def _OnRented(event):
+    """
+    Adds a rental when a RENTED event is published.
+    """
+
+    eb.ApplyEvent(_store, event, _ApplyRented)
+
+def _OnReturned(event):
+    """
+    Removes a rental when a copy is returned or its rental history
+    is deleted.
+    """
+
+    eb.ApplyEvent(_store, event, _ApplyReturned)
+
+eb.Subscribe(eb.RENTED, _OnRented)
+eb.Subscribe(eb.RETURNED, _OnReturned)
+eb.Subscribe(eb.PRUNED, _OnReturned)
+
+# ----------------------------------------------------------------------
+
+def GetOverdue(asOf=None):
+    """
+    Gets all open rentals that are overdue on the given date, i.e.
+    those due before it. Only the overdue rentals are looked at.
+
+    Parameters:
+    date asOf: The date to check against. Defaults to today.
+
+    Returns:
+    list: A list of (due date, game ID) tuples, earliest due first.
+    """
+
+    LoadTracker()
+    if asOf == None:
+        asOf = date.today()
+    end = bisect.bisect_left(_dueList, (asOf, ""))
+    return _dueList[:end]
+
+# ----------------------------------------------------------------------
+
+def GetDueSoon(days, asOf=None):
+    """
+    Gets all open rentals due within the given number of days.
+
+    Parameters:
+    int days: The number of days after asOf to look ahead.
+    date asOf: The first day to include. Defaults to today.
+
+    Returns:
+    list: A list of (due date, game ID) tuples, earliest due first.
+    """
+
+    LoadTracker()
+    if asOf == None:
+        asOf = date.today()
+    start = bisect.bisect_left(_dueList, (asOf, ""))
+    end = bisect.bisect_left(_dueList, (asOf + timedelta(days=days+1), ""))
+    return _dueList[start:end]
+
+# ----------------------------------------------------------------------
+
+def OverdueReport(asOf=None):
+    """
+    Gets the details of every rental that is overdue on a date.
+
+    Parameters:
+    date asOf: The date to check against. Defaults to today.
+
+    Returns:
+    dict: A dictionary of game IDs as keys and a sub-dictionary
+    containing the renter, rent date, due date and number of days
+    overdue of each overdue copy.
+    """
+
+    if asOf == None:
+        asOf = date.today()
+
+    report = {}
+    for dueDate, gameID in GetOverdue(asOf):
+        _, rentDate, renterID = _openRentals[gameID]
+        report.update({gameID : {"Renter" : renterID,
+                                 "Rented" : rentDate,
+                                 "Due" : str(dueDate),
+                                 "Days Overdue" : (asOf - dueDate).days}})
+    return report
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    # Print every overdue rental as of the end of the rental data
+    report = OverdueReport(date(2023, 12, 31))
+    for gameID in report:
+        print(gameID, report[gameID])
+
+    print("-"*100)
+
+    # Print rentals due in the week after the rental data ends
+    print(GetDueSoon(7, date(2023, 12, 14)))
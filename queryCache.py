@@ -0,0 +1,198 @@
+"""
+Query Cache module - queryCache.py
+
+This module provides a size-limited cache for the results of database
+lookups, so that repeated lookups of the same copies and searches don't
+read the databases again. Cached results are tied to a store version
+made up of a counter, which is increased by every change the database
+module makes, and the modification times and sizes of the databases,
+which change when another process edits them. Results from older
+versions are never returned.
+
+The cache is limited by the number of results it holds, not by the
+memory they use. A single result can be as large as a whole database,
+e.g. a search matching every copy, so the capacity should be kept low
+enough that capacity times the size of the largest database fits in
+memory.
+
+Functions:
+- CachedCall(func, *args): Returns the cached result of calling func
+with the given arguments, calling it if there is no valid cached result.
+- BumpVersion(): Marks all cached results as out of date.
+- SetCacheLimits(capacity, ttl): Sets the maximum number of cached
+results and the number of seconds each result stays valid for.
+- ClearCache(): Removes all cached results.
+- GetCacheStats(): Returns the hit, miss and eviction counts of the cache.
+"""
+
+# Last Updated: 19/10/2026
+
+import os
+import time
+from collections import OrderedDict
+
+# ----------------------------------------------------------------------
+# Cache data
+# ----------------------------------------------------------------------
+
+# Databases whose modification times and sizes are part of the store
+# version, as in database.GetVersion()
+WATCHED_DATABASES = ["Game_Info.txt", "Rental.txt"]
+
+cacheCapacity = 512 # Maximum number of cached results
+cacheTTL = 300 # Seconds a cached result stays valid for, or None
+
+_cache = OrderedDict() # Key -> (time cached, result), oldest used first
+_versionCounter = 0
+_cacheVersion = None # Store version of the results in the cache
+_stats = {"Hits": 0, "Misses": 0, "Evictions": 0}
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def _GetVersion():
+    """
+    Returns the current store version.
+    """
+
+    version = [_versionCounter]
+    for database in WATCHED_DATABASES:
+        try:
+            fileStat = os.stat(database)
+            version.append((fileStat.st_mtime_ns, fileStat.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+# ----------------------------------------------------------------------
+
+def _CopyResult(result):
+    """
+    Returns a copy of a list of entries, so that callers changing the
+    entries they are given don't change the cached result.
+    """
+
+    if not isinstance(result, list):
+        return result
+    return [list(e) if isinstance(e, list) else e for e in result]
+
+# ----------------------------------------------------------------------
+
+def CachedCall(func, *args):
+    """
+    Gets the result of calling a function with the given arguments,
+    using the cached result if there is one for the current store
+    version.
+
+    Parameters:
+    function func: The database lookup to call.
+    args: The arguments to call it with.
+
+    Returns:
+    The result of the call, as returned by func.
+    """
+
+    global _cacheVersion
+
+    version = _GetVersion()
+    if version != _cacheVersion:
+        # Results from older versions can't be used again
+        _cache.clear()
+        _cacheVersion = version
+
+    key = (func.__name__, args, version)
+    now = time.monotonic()
+    if key in _cache:
+        cachedTime, result = _cache[key]
+        if cacheTTL == None or now - cachedTime < cacheTTL:
+            _cache.move_to_end(key)
+            _stats["Hits"] += 1
+            return _CopyResult(result)
+        del _cache[key] # Expired
+
+    _stats["Misses"] += 1
+    result = func(*args)
+    _cache[key] = (now, _CopyResult(result))
+
+    # Remove the least recently used results if the cache is full
+    while len(_cache) > cacheCapacity:
+        _cache.popitem(last=False)
+        _stats["Evictions"] += 1
+
+    return result
+
+# ----------------------------------------------------------------------
+
+def BumpVersion():
+    """
+    Increases the store version counter. Called whenever a database
+    is changed, so that no older results are used.
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+
+    global _versionCounter
+    _versionCounter += 1
+
+# ----------------------------------------------------------------------
+
+def SetCacheLimits(capacity, ttl=None):
+    """
+    Sets the maximum size of the cache and how long results stay valid.
+
+    Parameters:
+    int capacity: The maximum number of cached results.
+    int ttl: Seconds a cached result stays valid for, or None to keep
+    results until the store version changes or they are evicted.
+
+    Returns:
+    None
+    """
+
+    global cacheCapacity, cacheTTL
+    cacheCapacity = capacity
+    cacheTTL = ttl
+
+    while len(_cache) > cacheCapacity:
+        _cache.popitem(last=False)
+        _stats["Evictions"] += 1
+
+# ----------------------------------------------------------------------
+
+def ClearCache():
+    """
+    Removes all cached results and resets the cache stats.
+
+    Parameters:
+    None
+
+    Returns:
+    None
+    """
+
+    _cache.clear()
+    for stat in _stats:
+        _stats[stat] = 0
+
+# ----------------------------------------------------------------------
+
+def GetCacheStats():
+    """
+    Gets stats about how well the cache is working.
+
+    Parameters:
+    None
+
+    Returns:
+    dict: The number of hits, misses and evictions, and the current
+    size and capacity of the cache.
+    """
+
+    stats = dict(_stats)
+    stats.update({"Size": len(_cache), "Capacity": cacheCapacity})
+    return stats
@@ -0,0 +1,134 @@
+"""
+Startup Check module - startupCheck.py
+
+This module measures how long it takes to import the modules used to
+rent and return games, and checks that it stays within a time budget.
+Each measurement is made in a fresh Python process so that modules
+already imported by the current process don't hide the cost.
+
+Functions:
+- MeasureImport(modules, repeats): Measures the time taken to import
+the given modules and finds the slowest modules they import.
+- CheckStartup(): Measures the rent/return modules and compares them
+against the startup budget.
+"""
+
+# Last Updated: 19/10/2026
+
+import subprocess
+import sys
+
+# ----------------------------------------------------------------------
+# Budget data
+# ----------------------------------------------------------------------
+
+# Modules needed to rent and return games
+RENT_RETURN_MODULES = ["gameRent", "gameReturn"]
+# Maximum time allowed to import the rent/return modules
+RENT_RETURN_BUDGET_MS = 100
+# Slow modules that the rent/return modules should never import
+FORBIDDEN_MODULES = ["matplotlib"]
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def MeasureImport(modules, repeats=5):
+    """
+    Measures the time taken to import modules in a fresh process.
+
+    Parameters:
+    list modules: The names of the modules to import.
+    int repeats: The number of times to measure. The fastest time is
+    used to reduce noise from other programs.
+
+    Returns:
+    dict: The import time in milliseconds, the five slowest modules
+    imported as (name, milliseconds) tuples, and a list of the
+    modules in FORBIDDEN_MODULES that were imported.
+    None: if the modules could not be imported.
+    """
+
+    code = ("import sys, time\n"
+            "t = time.perf_counter()\n"
+            f"import {', '.join(modules)}\n"
+            "print((time.perf_counter() - t) * 1000)\n"
+            f"print(','.join(m for m in {FORBIDDEN_MODULES}"
+            " if m in sys.modules))\n")
+
+    bestTime = None
+    for i in range(0, repeats):
+        result = subprocess.run([sys.executable, "-X", "importtime",
+                                 "-c", code],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"An error occurred: {result.stderr.strip()}")
+            return
+        lines = result.stdout.splitlines()
+        importTime = float(lines[0])
+        if bestTime == None or importTime < bestTime:
+            bestTime = importTime
+            forbidden = [m for m in lines[1].split(",") if m != ""]
+            importLog = result.stderr
+
+    # Each line of the log is "import time: self | cumulative | name"
+    slowest = []
+    for line in importLog.splitlines():
+        columns = line.split("|")
+        if len(columns) != 3 or not columns[1].strip().isdigit():
+            continue
+        slowest.append((columns[2].strip(), int(columns[1]) / 1000))
+    slowest.sort(key=lambda m: m[1], reverse=True)
+
+    return {"Time (ms)" : bestTime,
+            "Slowest" : slowest[:5],
+            "Forbidden" : forbidden}
+
+# ----------------------------------------------------------------------
+
+def CheckStartup():
+    """
+    Checks that the rent/return modules import within the budget and
+    without importing any forbidden modules.
+
+    Parameters:
+    None
+
+    Returns:
+    string: A report of the measurement and whether it passed.
+    """
+
+    result = MeasureImport(RENT_RETURN_MODULES)
+    if result == None:
+        return "Error: could not import the rent/return modules"
+
+    report = (f"Imported {', '.join(RENT_RETURN_MODULES)} in "
+              f"{result['Time (ms)']:.1f} ms "
+              f"(budget {RENT_RETURN_BUDGET_MS} ms)\n")
+    report = report + "Slowest imports:\n"
+    for name, ms in result["Slowest"]:
+        report = report + f"  {name}: {ms:.1f} ms\n"
+
+    passed = True
+    if result["Time (ms)"] > RENT_RETURN_BUDGET_MS:
+        passed = False
+        report = report + "Error: startup is over budget\n"
+    if result["Forbidden"] != []:
+        passed = False
+        report = report + ("Error: imported " +
+                           ", ".join(result["Forbidden"]) + "\n")
+    if passed:
+        report = report + "Startup is within budget"
+    return report.strip()
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    # Measure the rent/return path and report against the budget
+    report = CheckStartup()
+    print(report)
+    if "Error" in report:
+        sys.exit(1)
@@ -0,0 +1,201 @@
+"""
+Stock Ingest module - stockIngest.py
+
+This module contains functions that add a delivery of newly purchased
+games to the Game Info database from a CSV file.
+
+The CSV file must start with the header
+GameID,Platform,Genre,Title,Publisher,PurchaseDate
+and each row describes one copy. The GameID column holds either a
+full ID for the copy, e.g. 'cod10', or just the title prefix, e.g. 'cod',
+in which case the next free copy number for that prefix is assigned.
+
+Functions:
+- IngestPurchases(csvPath): Validates every row of a CSV file of
+purchases and adds them all to the Game Info database, or adds none
+of them if any row is invalid.
+"""
+
+# Last Updated: 19/10/2026
+
+import database as db
+import csv
+import os
+import re
+import tempfile
+from datetime import date
+
+# ----------------------------------------------------------------------
+# Ingest data
+# ----------------------------------------------------------------------
+
+CSV_HEADER = ["GameID", "Platform", "Genre", "Title",
+              "Publisher", "PurchaseDate"]
+
+# A game ID is a lowercase title prefix optionally followed by a copy
+# number, written with at least two digits and no other leading zeros
+# as in 'cod05' or 'cod120'
+ID_PATTERN = re.compile(r"([a-z]+)([0-9]{2}|[1-9][0-9]{2,}|)")
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def _ValidateRow(row, today):
+    """
+    Checks a CSV row and returns an error message, or "" if it is valid.
+    """
+
+    if len(row) != len(CSV_HEADER):
+        return f"expected {len(CSV_HEADER)} columns, found {len(row)}"
+    for i in range(0, len(row)):
+        if row[i] == "":
+            return f"{CSV_HEADER[i]} is empty"
+        if "," in row[i]:
+            return f"{CSV_HEADER[i]} cannot contain commas"
+    if ID_PATTERN.fullmatch(row[0]) == None:
+        return (f"invalid GameID '{row[0]}', expected a prefix such as "
+                "'cod' or a prefix and copy number such as 'cod05'")
+    try:
+        purchaseDate = date.fromisoformat(row[5])
+    except ValueError:
+        return f"invalid PurchaseDate '{row[5]}', expected YYYY-MM-DD"
+    if purchaseDate > today:
+        return f"PurchaseDate {row[5]} is in the future"
+    return ""
+
+# ----------------------------------------------------------------------
+
+def IngestPurchases(csvPath):
+    """
+    Adds the copies listed in a CSV file of purchases to the Game Info
+    database. Every row is checked for missing or invalid values, GameIDs
+    that are already used, and title prefixes that already belong to a
+    different title. If any row has an error, no copies are added.
+
+    Parameters:
+    string csvPath: The file name of the CSV file to add.
+
+    Returns:
+    string: An error message for each invalid row, or a message
+    indicating how many copies were added.
+    """
+
+    # IDs already used by copies in Game Info, or by pruned copies that
+    # still have a rental history
+    usedIDs = set()
+    prefixTitles = {} # Title prefix -> title of the game it belongs to
+    nextNumbers = {} # Title prefix -> next free copy number
+    gameData = db.GetDatabase("Game_Info.txt")
+    rentalData = db.GetDatabase("Rental.txt")
+    if gameData == None or rentalData == None:
+        return "Error: could not read the databases"
+    for entry in gameData:
+        usedIDs.add(entry[0])
+        match = ID_PATTERN.fullmatch(entry[0])
+        if match != None:
+            prefixTitles.setdefault(match[1], entry[3])
+    for rental in rentalData:
+        usedIDs.add(rental[0])
+    for id in usedIDs:
+        match = ID_PATTERN.fullmatch(id)
+        if match != None and match[2] != "":
+            nextNumbers[match[1]] = max(nextNumbers.get(match[1], 1),
+                                        int(match[2]) + 1)
+
+    # Check each row as it is read, keeping the valid ones
+    errors = []
+    newEntries = []
+    today = date.today()
+    try:
+        f = open(csvPath, "r", newline="")
+    except OSError as e:
+        return f"Error: could not read {csvPath}: {e}"
+    try:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if [column.strip() for column in header] != CSV_HEADER:
+            f.close()
+            return "Error: CSV header must be " + ",".join(CSV_HEADER)
+
+        for row in reader:
+            lineNum = reader.line_num
+            if row == []:
+                continue # Ignore blank lines
+            row = [value.strip() for value in row]
+            error = _ValidateRow(row, today)
+            if error == "":
+                prefix, number = ID_PATTERN.fullmatch(row[0]).groups()
+                title = prefixTitles.setdefault(prefix, row[3])
+                if title.lower() != row[3].lower():
+                    error = f"prefix '{prefix}' is used by '{title}'"
+                elif number != "" and row[0] in usedIDs:
+                    error = f"duplicate GameID '{row[0]}'"
+            if error != "":
+                errors.append(f"Error: line {lineNum}: {error}")
+                continue
+
+            if number != "":
+                usedIDs.add(row[0])
+                nextNumbers[prefix] = max(nextNumbers.get(prefix, 1),
+                                          int(number) + 1)
+            newEntries.append(row)
+        f.close()
+    except Exception as e:
+        f.close()
+        return f"Error: could not read {csvPath}: {e}"
+
+    if errors != []:
+        return "\n".join(errors)
+    if newEntries == []:
+        return "No copies to add"
+
+    # Assign copy numbers to rows that only gave a prefix. This is done
+    # after reading every row so that they can't take a number given to
+    # a later row.
+    for entry in newEntries:
+        prefix, number = ID_PATTERN.fullmatch(entry[0]).groups()
+        if number != "":
+            continue
+        n = nextNumbers.get(prefix, 1)
+        while f"{prefix}{n:02d}" in usedIDs:
+            n += 1
+        entry[0] = f"{prefix}{n:02d}"
+        usedIDs.add(entry[0])
+        nextNumbers[prefix] = n + 1
+
+    if not db.AddGameEntries(newEntries):
+        return "Error: could not write to Game Info"
+    return (f"Added {len(newEntries)} copies: "
+            f"{newEntries[0][0]} to {newEntries[-1][0]}")
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+# SAVE COPIES OF THESE FILES BEFORE RUNNING: Game_Info.txt
+# TEST CODE WILL ALTER THESE DATABASES
+
+if __name__ == "__main__":
+
+    # Write a delivery to a temporary CSV file, add it to the database
+    # and delete the file again
+    def IngestDelivery(rows):
+        f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        f.write(",".join(CSV_HEADER) + "\n")
+        for row in rows:
+            f.write(row + "\n")
+        f.close()
+        result = IngestPurchases(f.name)
+        os.remove(f.name)
+        return result
+
+    # Add a small delivery to the database
+    print(IngestDelivery(["cod,PC,Action,COD,Activision,2023-12-14",
+                          "cod,Xbox,Action,COD,Activision,2023-12-14",
+                          "tlou,PlayStation,Action,The Last of Us,"
+                          "Naughty Dog,2023-12-14"]))
+
+    # Attempt to add the same copies again under an existing ID
+    print(IngestDelivery(["cod01,PC,Action,COD,Activision,2023-12-14",
+                          "ark,PC,Action,COD,Activision,2023-12-14"]))
@@ -0,0 +1,290 @@
+"""
+Store Report module - storeReport.py
+
+This module saves the results of the unpopular games view to a report
+file, so that the menu can show them without calculating them from the
+databases each time. It is intended to be run as a nightly job.
+
+The report holds the stats and availability of every copy, the averages
+across copies, the unpopular copies and the advice for each of them,
+along with a watermark recording the position in the Event Log and the
+state of the databases it was built from. Refreshing the report applies
+only the rentals, returns, feedback, prunes and new stock logged since
+the watermark to the copies they affect. If a database was changed
+without logging an event, e.g. by hand, the report is rebuilt instead.
+
+Running this module refreshes the report, checks it against the
+databases, rebuilding it if it doesn't match, and then trims the Event
+Log up to the watermark with eventBus.TrimLog(), so the log only holds the
+events logged since the last nightly run.
+
+Functions:
+- BuildReport(): Builds the report from the databases.
+- RefreshReport(): Updates the report with the changes made since it
+was last built or refreshed.
+- LoadReport(): Returns the report if it is up to date.
+- CheckReport(): Returns the copies whose stats in the saved report
+differ from stats built from the databases.
+"""
+
+# Last Updated: 19/10/2026
+
+import database as db
+import eventBus as eb
+import inventoryPruning as ip
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+
+# ----------------------------------------------------------------------
+# Report data
+# ----------------------------------------------------------------------
+
+REPORT_FILE = "Store_Report.json"
+
+# ----------------------------------------------------------------------
+# Functions
+# ----------------------------------------------------------------------
+
+def _GetDatabaseVersions():
+    """
+    Returns the version of each database the report is built from.
+    """
+
+    return [db.GetVersion(database) for database in ip.STATS_DATABASES]
+
+# ----------------------------------------------------------------------
+
+def _SaveReport(gameStats, totals, offset, versions):
+    """
+    Works out the averages, unpopular games, advice and availability
+    from the stats of each game and writes the report file, along with
+    the position in the Event Log and versions of the databases that
+    the stats match.
+    """
+
+    averages = ip.CalculateAverages(gameStats, totals)
+    unpopular = ip.FindUnpopularIn(gameStats, averages)
+    suggestions = ip.UnpopularInfo(unpopular, averages)
+    availability = {}
+    for id in gameStats:
+        availability.update({id : gameStats[id]["Last Return"] != ""})
+
+    report = {"Watermark" : {"Event Offset" : offset,
+                             "Databases" : versions,
+                             "Date" : str(date.today())},
+              "Games" : gameStats,
+              "Totals" : totals,
+              "Availability" : availability,
+              "Averages" : list(averages),
+              "Unpopular" : unpopular,
+              "Suggestions" : suggestions}
+
+    # Write to a temporary file first so a reader never sees half a report
+    tempName = REPORT_FILE + ".tmp"
+    f = open(tempName, "w")
+    json.dump(report, f)
+    f.close()
+    os.replace(tempName, REPORT_FILE)
+    return report
+
+# ----------------------------------------------------------------------
+
+def _ReadReport():
+    """
+    Reads the report file, returning None if it is missing or damaged.
+    """
+
+    try:
+        f = open(REPORT_FILE, "r")
+        report = json.load(f)
+        f.close()
+    except (OSError, ValueError):
+        return
+    report["Averages"] = tuple(report["Averages"])
+    return report
+
+# ----------------------------------------------------------------------
+
+def BuildReport():
+    """
+    Builds the report from the databases and saves it.
+
+    Parameters:
+    None
+
+    Returns:
+    dict: The saved report.
+    """
+
+    # Take the log position first so changes made while building are
+    # picked up by the next refresh, and the database versions last so
+    # that a change made while building causes a rebuild rather than
+    # being applied twice
+    offset = eb.GetLogOffset()
+    gameStats, totals = ip.GetGameStats()
+    return _SaveReport(gameStats, totals, offset, _GetDatabaseVersions())
+
+# ----------------------------------------------------------------------
+
+def RefreshReport():
+    """
+    Updates the saved report with the changes logged since its
+    watermark, only changing the stats of the copies they affect.
+    The report is rebuilt from the databases instead if there isn't one
+    or a database was changed without logging an event. Each event
+    records the versions of its database before and after the change,
+    so a change that wasn't logged shows up as an event that doesn't
+    follow on from the previous one, or databases that don't match
+    the last event.
+
+    Parameters:
+    None
+
+    Returns:
+    string: A message describing how the report was updated.
+    """
+
+    report = _ReadReport()
+    if report == None:
+        BuildReport()
+        return "Built a new report"
+
+    watermark = report["Watermark"]
+    offset = watermark["Event Offset"]
+    if eb.GetLogOffset() < offset:
+        BuildReport()
+        return "Event Log was cleared: rebuilt the report"
+
+    events, newOffset = eb.ReadEvents(offset)
+    versions = list(watermark["Databases"])
+    gameStats = report["Games"]
+    totals = report["Totals"]
+    touched = set()
+    for event in events:
+        if "OldVersion" not in event:
+            BuildReport()
+            return "Event Log has events without versions: rebuilt the report"
+        i = ip.STATS_DATABASES.index(event["Database"])
+        if event["OldVersion"] != versions[i]:
+            BuildReport()
+            return ("Databases changed without logging an event: "
+                    "rebuilt the report")
+        versions[i] = event["NewVersion"]
+
+        ip.ApplyStatsEvent(gameStats, totals, event)
+        if event["Type"] == eb.STOCKED:
+            touched.update(game[0] for game in event["Entries"])
+        else:
+            touched.add(event["GameID"])
+
+    if versions != _GetDatabaseVersions():
+        BuildReport()
+        return ("Databases changed without logging an event: "
+                "rebuilt the report")
+
+    _SaveReport(gameStats, totals, newOffset, versions)
+    return f"Applied {len(events)} events to {len(touched)} copies"
+
+# ----------------------------------------------------------------------
+
+def LoadReport():
+    """
+    Loads the saved report if it is up to date, i.e. it was made today
+    and nothing has changed since.
+
+    Parameters:
+    None
+
+    Returns:
+    dict: The report, with keys Averages, Unpopular and Suggestions
+    matching the results of GetAverages(), FindUnpopular() and
+    UnpopularInfo() in inventoryPruning.
+    None: If there is no report or it is out of date.
+    """
+
+    report = _ReadReport()
+    if report == None:
+        return
+    watermark = report["Watermark"]
+    if watermark["Date"] != str(date.today()):
+        return
+    if watermark["Event Offset"] != eb.GetLogOffset():
+        return
+    if watermark["Databases"] != _GetDatabaseVersions():
+        return
+    return report
+
+# ----------------------------------------------------------------------
+
+def CheckReport():
+    """
+    Checks that the stats in the saved report match stats built from
+    the databases, e.g. to check that refreshing the report gave the
+    same result as rebuilding it. The stats are built in a fresh process
+    so that in-memory stats of this process can't hide a difference.
+
+    Parameters:
+    None
+
+    Returns:
+    list: The IDs of the copies whose stats differ, followed by "Totals"
+    if the totals differ, or an empty list if the report matches.
+    None: If there is no report, the stats could not be built or the
+    databases changed since the report was saved.
+    """
+
+    report = _ReadReport()
+    if report == None:
+        return
+
+    code = ("import inventoryPruning as ip, storeReport as sr, json\n"
+            "gameStats, totals = ip.GetGameStats()\n"
+            "print(json.dumps([gameStats, totals,"
+            " sr._GetDatabaseVersions()]))\n")
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"An error occurred: {result.stderr.strip()}")
+        return
+    gameStats, totals, versions = json.loads(result.stdout.splitlines()[-1])
+    if versions != report["Watermark"]["Databases"]:
+        return # The report is out of date, so it can't be compared
+
+    differences = []
+    for id in sorted(set(gameStats) | set(report["Games"])):
+        if gameStats.get(id) != report["Games"].get(id):
+            differences.append(id)
+    for built, saved in zip(totals, report["Totals"]):
+        if abs(built - saved) > 1e-9:
+            differences.append("Totals")
+            break
+    return differences
+
+# ----------------------------------------------------------------------
+# MAIN CODE
+# ----------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    # Refresh the report, building it if it doesn't exist yet
+    print(RefreshReport())
+
+    # Check the refreshed report against the databases
+    differences = CheckReport()
+    if differences:
+        print(f"Report didn't match the databases for {differences}")
+        BuildReport()
+        print("Rebuilt the report")
+
+    # The report includes every event before its watermark, so they
+    # are no longer needed in the log
+    watermark = _ReadReport()["Watermark"]
+    print(f"Trimmed {eb.TrimLog(watermark['Event Offset'])} bytes "
+          "from the Event Log")
+
+    report = LoadReport()
+    print(f"{len(report['Unpopular'])} unpopular games")
+    print(report["Averages"])